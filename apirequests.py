@@ -6,8 +6,7 @@ from nba_api.stats.endpoints import (
     boxscorehustlev2,
     boxscoremiscv3,
     boxscoreplayertrackv3,
-    PlayerGameLogs,
-    commonteamroster,
+    scheduleleaguev2,
 )
 from nba_api.stats.static import teams
 from datetime import date
@@ -31,6 +30,10 @@ class NBADataFetcher:
         self.team_dict = {
             team["id"]: team["abbreviation"] for team in teams.get_teams()
         }
+
+        # Every (game_id, data_type) that fetch_box_score gave up on, so they can be re-fetched later
+        self.failed_fetches = []
+
         game_logs = self.fetch_league_game_logs()
         processed_game_logs = self.process_game_logs(game_logs)
         self.processed_game_logs = processed_game_logs
@@ -120,12 +123,35 @@ class NBADataFetcher:
 
         return merged_df
 
+    # LeagueGameLog only returns games that have been played, so the rest of the season comes from the schedule
+    # Returns the regular season games that aren't in the game logs yet, in the same format as the processed game logs
+    # with empty scores
+    def fetch_remaining_schedule(self):
+
+        schedule = scheduleleaguev2.ScheduleLeagueV2(season=self.season).season_games.get_data_frame()
+
+        # Regular season gameIds start with "002", this also leaves out preseason, All-Star and NBA Cup final games
+        schedule = schedule[schedule["gameId"].str.startswith("002")]
+        schedule = schedule[~schedule["gameId"].isin(self.processed_game_logs["gameId"])]
+
+        return pd.DataFrame(
+            {
+                "gameId": schedule["gameId"],
+                "GAME_DATE": pd.to_datetime(schedule["gameDateEst"]).dt.date,
+                "HOME_TEAM_ABBREVIATION": schedule["homeTeam_teamTricode"],
+                "HOME_TEAM_PTS": None,
+                "AWAY_TEAM_ABBREVIATION": schedule["awayTeam_teamTricode"],
+                "AWAY_TEAM_PTS": None,
+            }
+        )
+
     # This function will fetch box score statistics for a given game, specified by the game_id
     # We get this game_id from the game logs
     # data_type can be "advanced", "traditional", "misc", "hustle", "track"
     # These data types represent different endpoints we call to collect data
     # We call 5 different ones because each provides different statistics about the team's performance in that game
-    def fetch_box_score(self, game_id, data_type):
+    # stats can be "team_stats" (2 rows, one per team) or "player_stats" (one row per player on either roster)
+    def fetch_box_score(self, game_id, data_type, stats="team_stats"):
 
         max_retries = 10
         wait_seconds = 0.1
@@ -162,8 +188,8 @@ class NBADataFetcher:
                         box_score = boxscoreplayertrackv3.BoxScorePlayerTrackV3(game_id)
 
                 # team_stats will be a 2 row DataFrame, containing the box scores for both teams in the game
-                team_stats = box_score.team_stats.get_data_frame()
-                return team_stats
+                # player_stats has the same statistics for each player, including those who did not play
+                return getattr(box_score, stats).get_data_frame()
 
             # If we get a JSONDecodeError, retry the API call up to 10 times before skipping it
             except JSONDecodeError as e:
@@ -174,6 +200,19 @@ class NBADataFetcher:
                     time.sleep(wait_seconds)
                 else:
                     print("Fetching this game failed, skipping")
+                    self.failed_fetches.append((game_id, data_type))
+
+    # Re-fetch the box scores for games flagged by validation.DataValidator.refetch_game_ids
+    # Returns a dictionary from data_type to a DataFrame with the team rows for all of the games that succeeded
+    def refetch_box_scores(self, game_ids, data_types):
+
+        refetched = {}
+        for data_type in data_types:
+            team_stats = [self.fetch_box_score(game_id, data_type) for game_id in game_ids]
+            team_stats = [df for df in team_stats if df is not None]
+            if team_stats:
+                refetched[data_type] = pd.concat(team_stats)
+        return refetched
 
 
 if __name__ == "__main__":
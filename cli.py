@@ -0,0 +1,299 @@
+import argparse
+import os
+
+
+# Command line entry point for the whole pipeline, i.e.
+#   python cli.py fetch --seasons 2024-25 --data-types advanced traditional
+#   python cli.py preprocess --seasons 2024-25 2023-24 --spans 50 25 10 --shift 1
+#   python cli.py serve --port 8000
+# Each subcommand imports the modules it needs when it runs, so short jobs don't pay for importing
+# nba_api (which loads every endpoint module) or pandas unless they actually use them
+
+
+def print_failed_fetches(fetcher):
+    if fetcher.failed_fetches:
+        print(f"{fetcher.season}: {len(fetcher.failed_fetches)} box scores failed to fetch")
+        for game_id, data_type in fetcher.failed_fetches:
+            print(f"  {game_id} {data_type}")
+
+
+def run_fetch(args):
+    import pandas as pd
+    from apirequests import NBADataFetcher
+    from validation import DataValidator, KEY_COLUMNS
+
+    for season in args.seasons:
+        fetcher = NBADataFetcher(season)
+        fetcher.processed_game_logs.to_csv(f"{season}_all_games.csv", index=False)
+
+        # Unplayed games are kept out of the games file, since the preprocessors and validation expect scores
+        if args.schedule:
+            fetcher.fetch_remaining_schedule().to_csv(f"{season}_schedule.csv", index=False)
+
+        # By default every game in the season is fetched, otherwise only the games we were given
+        # With --refetch-invalid, each game that failed validation is fetched again from the sources it failed in,
+        # limited to --data-types if any were given
+        if args.refetch_invalid:
+            validator = DataValidator(season)
+            game_ids_by_type = validator.refetch_sources(validator.validate())
+            if args.data_types:
+                game_ids_by_type = {
+                    data_type: game_ids
+                    for data_type, game_ids in game_ids_by_type.items()
+                    if data_type in args.data_types
+                }
+            if not game_ids_by_type:
+                print(f"{season}: no box scores to re-fetch")
+        else:
+            game_ids = args.game_ids or fetcher.processed_game_logs["gameId"].tolist()
+            game_ids_by_type = {data_type: game_ids for data_type in args.data_types}
+
+        refetched = {}
+        for data_type, game_ids in game_ids_by_type.items():
+            print(f"{season} {data_type}: fetching {len(game_ids)} games")
+            refetched.update(fetcher.refetch_box_scores(game_ids, [data_type]))
+        for data_type, team_stats in refetched.items():
+            path = f"{season}_{data_type}_stats.csv"
+
+            # gameId comes back from the API as a string with leading zeros, but is an integer in the saved files
+            team_stats["gameId"] = team_stats["gameId"].astype(int)
+            if os.path.exists(path):
+                team_stats = pd.concat([pd.read_csv(path), team_stats])
+
+            # Fetched rows replace any rows already saved for the same game and team
+            team_stats = team_stats.drop_duplicates(subset=KEY_COLUMNS, keep="last")
+            team_stats.to_csv(path, index=False)
+
+        print_failed_fetches(fetcher)
+
+
+def run_fetch_players(args):
+    from apirequests import NBADataFetcher
+    from players import PlayerDataIngester
+
+    for season in args.seasons:
+        fetcher = NBADataFetcher(season)
+        ingester = PlayerDataIngester(fetcher, args.data_types, args.batch_size)
+        ingester.ingest(args.game_ids)
+
+        # Games that failed are skipped by the ingest, running fetch-players again will retry them
+        print_failed_fetches(fetcher)
+
+
+def run_player_features(args):
+    from players import PlayerFeatureAggregator
+
+    aggregator = PlayerFeatureAggregator(
+        args.seasons, args.span, args.shift, args.rotation_size, args.data_types
+    )
+    aggregator.aggregate().to_csv(args.output, index=False)
+
+
+def run_validate(args):
+    from validation import validate_seasons
+
+    validate_seasons(args.seasons)
+
+
+def run_preprocess(args):
+    from preprocessing import build_team_averages, save_team_averages
+
+    p = build_team_averages(args.seasons, args.spans, args.shift)
+    save_team_averages(p)
+
+
+def run_export(args):
+    import pandas as pd
+    from feature_store import export_feature_matrix
+
+    # The first column is the index that Preprocessor.team_stats.to_csv writes out
+    team_stats = pd.read_csv(args.input, index_col=0)
+    export_feature_matrix(team_stats, args.output, args.dtype)
+    print(f"Saved {len(team_stats)} rows to {args.output}.npy")
+
+
+def run_serve(args):
+    import json
+    import math
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from feature_store import attach_feature_matrix
+
+    matrix, metadata = attach_feature_matrix(args.matrix)
+
+    # Find each team's most recent row, dates are saved as "YYYY-MM-DD" so they compare correctly as strings
+    latest = {}
+    for row, (team, game_date) in enumerate(zip(metadata["teamTricode"], metadata["date"])):
+        if team not in latest or game_date >= metadata["date"][latest[team]]:
+            latest[team] = row
+
+    class FeatureHandler(BaseHTTPRequestHandler):
+
+        # GET /teams lists the teams, GET /teams/BOS returns the latest features for that team
+        def do_GET(self):
+            parts = self.path.strip("/").split("/")
+            if parts == ["teams"]:
+                self.send_json(200, sorted(latest))
+            elif len(parts) == 2 and parts[0] == "teams" and parts[1].upper() in latest:
+                row = latest[parts[1].upper()]
+                self.send_json(
+                    200,
+                    {
+                        "teamTricode": metadata["teamTricode"][row],
+                        "gameId": metadata["gameId"][row],
+                        "date": metadata["date"][row],
+                        # NaN isn't valid JSON, so missing averages (i.e. before a team's first game) are sent as null
+                        "features": dict(
+                            zip(
+                                metadata["columns"],
+                                [v if math.isfinite(v) else None for v in matrix[row].tolist()],
+                            )
+                        ),
+                    },
+                )
+            else:
+                self.send_json(404, {"error": f"no route for {self.path}"})
+
+        def send_json(self, status, body):
+            # allow_nan=False makes any non-finite value that slipped through fail instead of sending invalid JSON
+            payload = json.dumps(body, allow_nan=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer((args.host, args.port), FeatureHandler)
+    print(f"Serving {args.matrix}.npy on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+def run_simulate(args):
+    import pandas as pd
+    from simulation import SeasonSimulator
+
+    # all_games.csv from the preprocess subcommand has an index column, the per-season files don't
+    # The games files only have games that have been played, the unplayed games come from the schedule files
+    games = pd.concat([pd.read_csv(path) for path in [args.games] + args.schedule], ignore_index=True)
+    games = games.loc[:, ~games.columns.str.startswith("Unnamed")]
+
+    probabilities = None
+    if args.probabilities:
+        probabilities = pd.read_csv(args.probabilities).set_index("gameId")["home_win_probability"]
+    matchup_probabilities = None
+    if args.matchups:
+        matchup_probabilities = pd.read_csv(args.matchups, index_col=0)
+
+    try:
+        simulator = SeasonSimulator(games, probabilities, matchup_probabilities, args.season)
+    except ValueError as e:
+        args.parser.error(str(e))
+    if len(simulator.probabilities) == 0:
+        print(
+            "No unplayed games found, so these are the final standings. "
+            "Fetch the rest of the season with `cli.py fetch --schedule` and pass it with --schedule"
+        )
+    results = simulator.simulate(args.n_seasons, args.batch_size, args.processes, args.seed)
+    results.to_csv(args.output)
+    print(results[["conference", "expected_wins", "play_in", "playoffs"]].round(3).to_string())
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="NBA data pipeline")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fetch = subparsers.add_parser("fetch", help="fetch game logs and box scores from the NBA API")
+    fetch.add_argument("--seasons", nargs="+", required=True, help='seasons of format "YYYY-YY"')
+    fetch.add_argument(
+        "--data-types",
+        nargs="*",
+        default=[],
+        choices=["advanced", "traditional", "hustle", "misc", "track"],
+        help="box scores to fetch, by default only the game logs are fetched",
+    )
+    fetch.add_argument("--game-ids", nargs="+", help="only fetch box scores for these games")
+    fetch.add_argument(
+        "--refetch-invalid",
+        action="store_true",
+        help="re-fetch games that fail validation, from the box scores they failed in",
+    )
+    fetch.add_argument(
+        "--schedule",
+        action="store_true",
+        help='also save the unplayed games to "{season}_schedule.csv", for the simulate subcommand',
+    )
+    fetch.set_defaults(func=run_fetch)
+
+    fetch_players = subparsers.add_parser(
+        "fetch-players", help="fetch player box scores into parquet files"
+    )
+    fetch_players.add_argument("--seasons", nargs="+", required=True)
+    fetch_players.add_argument(
+        "--data-types", nargs="+", default=["traditional", "advanced"], choices=["traditional", "advanced"]
+    )
+    fetch_players.add_argument("--game-ids", nargs="+", help="only fetch these games")
+    fetch_players.add_argument("--batch-size", type=int, default=50, help="games per parquet file")
+    fetch_players.set_defaults(func=run_fetch_players)
+
+    player_features = subparsers.add_parser(
+        "player-features", help="aggregate player box scores into team features"
+    )
+    player_features.add_argument("--seasons", nargs="+", required=True)
+    player_features.add_argument("--span", type=int, default=10)
+    player_features.add_argument("--shift", type=int, default=1)
+    player_features.add_argument("--rotation-size", type=int, default=8)
+    player_features.add_argument(
+        "--data-types", nargs="+", default=["traditional", "advanced"], choices=["traditional", "advanced"]
+    )
+    player_features.add_argument("--output", default="player_team_features.csv")
+    player_features.set_defaults(func=run_player_features)
+
+    validate = subparsers.add_parser("validate", help="check saved data for bad or missing rows")
+    validate.add_argument("--seasons", nargs="+", required=True)
+    validate.set_defaults(func=run_validate)
+
+    preprocess = subparsers.add_parser("preprocess", help="build all_games.csv and all_team_averages.csv")
+    preprocess.add_argument("--seasons", nargs="+", required=True)
+    preprocess.add_argument("--spans", nargs="+", type=int, default=[50, 25, 10])
+    preprocess.add_argument("--shift", type=int, default=1)
+    preprocess.set_defaults(func=run_preprocess)
+
+    export = subparsers.add_parser("export", help="export team averages as a memory-mapped matrix")
+    export.add_argument("--input", default="all_team_averages.csv")
+    export.add_argument("--output", default="all_team_averages")
+    export.add_argument("--dtype", default="float64", choices=["float32", "float64"])
+    export.set_defaults(func=run_export)
+
+    serve = subparsers.add_parser("serve", help="serve each team's latest features over HTTP")
+    serve.add_argument("--matrix", default="all_team_averages")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.set_defaults(func=run_serve)
+
+    simulate = subparsers.add_parser("simulate", help="simulate the rest of the season")
+    simulate.add_argument("--games", default="all_games.csv", help="games file with the games played so far")
+    simulate.add_argument(
+        "--schedule", nargs="*", default=[], help="schedule files from fetch --schedule with the unplayed games"
+    )
+    simulate.add_argument("--season", help='season of format "YYYY-YY", defaults to the latest season in the games')
+    simulate.add_argument(
+        "--probabilities", help="csv with gameId and home_win_probability for each unplayed game"
+    )
+    simulate.add_argument(
+        "--matchups", help="csv matrix of home win probabilities, rows are home teams and columns are away teams"
+    )
+    simulate.add_argument("--n-seasons", type=int, default=100_000)
+    simulate.add_argument("--batch-size", type=int, default=5_000)
+    simulate.add_argument("--processes", type=int, help="worker processes, defaults to the number of CPUs")
+    simulate.add_argument("--seed", type=int)
+    simulate.add_argument("--output", default="season_simulation.csv")
+    simulate.set_defaults(func=run_simulate, parser=simulate)
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    args.func(args)
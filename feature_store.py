@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import numpy as np
+
+
+# These columns identify a row of Preprocessor.team_stats rather than describe the team, so they go in the sidecar
+INDEX_COLUMNS = ["teamTricode", "gameId", "date"]
+
+
+# Save the numeric feature block of Preprocessor.team_stats as a single .npy file, plus a .json sidecar
+# The .npy file can be memory-mapped, so any number of training processes can read it through the same
+# pages of the OS file cache instead of each parsing all_team_averages.csv into its own copy
+def export_feature_matrix(team_stats, path, dtype="float64"):
+
+    index = team_stats[INDEX_COLUMNS]
+    features = team_stats.drop(columns=INDEX_COLUMNS).select_dtypes(include="number")
+
+    # Both files are written to temporary paths in the same directory and then renamed over the old ones
+    # Workers that have the old .npy memory-mapped keep reading the old file, instead of seeing it truncated and
+    # rewritten under them
+    directory = os.path.dirname(os.path.abspath(path))
+    npy_fd, npy_tmp = tempfile.mkstemp(suffix=".npy", dir=directory)
+    json_fd, json_tmp = tempfile.mkstemp(suffix=".json", dir=directory)
+    os.close(npy_fd)
+    try:
+        # open_memmap writes the .npy header, then we fill the data in place without building a second copy in memory
+        matrix = np.lib.format.open_memmap(
+            npy_tmp, mode="w+", dtype=dtype, shape=features.shape
+        )
+        matrix[:] = features.to_numpy(dtype=dtype)
+        matrix.flush()
+        del matrix
+
+        metadata = {
+            "shape": list(features.shape),
+            "dtype": np.dtype(dtype).str,
+            "columns": list(features.columns),
+            "source_dtypes": {col: str(features[col].dtype) for col in features.columns},
+            "teamTricode": index["teamTricode"].astype(str).tolist(),
+            "gameId": index["gameId"].astype(int).tolist(),
+            "date": index["date"].astype(str).tolist(),
+        }
+        with os.fdopen(json_fd, "w") as f:
+            json.dump(metadata, f)
+
+        # mkstemp creates files only the owner can read, give them the permissions a normal write would have
+        umask = os.umask(0)
+        os.umask(umask)
+        for tmp in [npy_tmp, json_tmp]:
+            os.chmod(tmp, 0o666 & ~umask)
+
+        # A worker attaching between these two renames sees a mismatched pair, which attach_feature_matrix rejects
+        os.replace(npy_tmp, f"{path}.npy")
+        os.replace(json_tmp, f"{path}.json")
+    except BaseException:
+        for tmp in [npy_tmp, json_tmp]:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        raise
+
+# Attach to a matrix saved by export_feature_matrix
+# The array is opened read-only, so rows are only read from disk (or the shared file cache) when they are used
+# Returns the array and the metadata dictionary from the sidecar
+def attach_feature_matrix(path):
+
+    with open(f"{path}.json") as f:
+        metadata = json.load(f)
+
+    matrix = np.load(f"{path}.npy", mmap_mode="r")
+    if list(matrix.shape) != metadata["shape"] or matrix.dtype.str != metadata["dtype"]:
+        raise ValueError(
+            f"{path}.npy does not match its metadata, it may have been overwritten by another export"
+        )
+    return matrix, metadata
+
+
+# Wrap an attached matrix as a DataFrame indexed by team, game and date
+# pandas keeps a view of the read-only array for a single dtype block, so this does not copy the features
+def feature_frame(matrix, metadata):
+
+    # pandas is imported here so processes that only need the raw array don't pay for importing it
+    import pandas as pd
+
+    index = pd.MultiIndex.from_arrays(
+        [metadata["teamTricode"], metadata["gameId"], metadata["date"]],
+        names=INDEX_COLUMNS,
+    )
+    return pd.DataFrame(matrix, index=index, columns=metadata["columns"], copy=False)
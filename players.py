@@ -0,0 +1,212 @@
+import os
+import numpy as np
+import pandas as pd
+
+
+# Player statistics we keep from each box score endpoint, on top of the identifying columns below
+# Keeping only these (as float32) is what keeps the player files small, there are ~15x as many player rows as team rows
+PLAYER_STAT_COLUMNS = {
+    "traditional": [
+        "fieldGoalsAttempted",
+        "threePointersAttempted",
+        "freeThrowsAttempted",
+        "reboundsTotal",
+        "assists",
+        "steals",
+        "blocks",
+        "turnovers",
+        "points",
+        "plusMinusPoints",
+    ],
+    "advanced": [
+        "offensiveRating",
+        "defensiveRating",
+        "netRating",
+        "usagePercentage",
+        "trueShootingPercentage",
+        "PIE",
+    ],
+}
+
+PLAYER_KEY_COLUMNS = ["gameId", "teamTricode", "personId"]
+
+# The comment column explains why a player has no minutes, i.e. "DNP - Coach's Decision" or "DND - Injury/Illness"
+# DNP means the player was available but not used, these mean the player could not have played
+UNAVAILABLE_COMMENTS = ("DND", "NWT", "INACTIVE")
+
+
+# Minutes are strings of format "MM:SS", with an empty string for players who did not play
+# This is the vectorized equivalent of preprocessing.convert_minutes_to_float
+def minutes_to_float(minutes):
+    parts = minutes.astype(str).str.extract(r"^(\d+(?:\.\d+)?):(\d+)")
+    return (parts[0].astype(float) + parts[1].astype(float) / 60).fillna(0).astype("float32")
+
+
+# Shrink a player_stats DataFrame from the API down to the columns we keep, with compact dtypes
+def compact_player_stats(player_stats, data_type):
+    compact = pd.DataFrame(
+        {
+            "gameId": player_stats["gameId"].astype("int64"),
+            "teamTricode": player_stats["teamTricode"].astype("category"),
+            "personId": player_stats["personId"].astype("int64"),
+        }
+    )
+
+    # Availability only needs to be stored once, so it comes from the traditional box score
+    if data_type == "traditional":
+        compact["minutes"] = minutes_to_float(player_stats["minutes"])
+        compact["comment"] = player_stats["comment"].fillna("").astype("category")
+
+    for col in PLAYER_STAT_COLUMNS[data_type]:
+        compact[col] = pd.to_numeric(player_stats[col], errors="coerce").astype("float32")
+    return compact
+
+
+# Use this class to save the player box scores for a season
+# Player rows are saved in batches as parquet files in a directory per data type, i.e. "2024-25_player_traditional/"
+# Each batch is written as soon as it is fetched, so only one batch of player rows is ever held in memory,
+# and an interrupted ingest picks up where it left off
+class PlayerDataIngester:
+
+    def __init__(self, fetcher, data_types=("traditional", "advanced"), batch_size=50):
+
+        # fetcher is an apirequests.NBADataFetcher for the season we want to ingest
+        self.fetcher = fetcher
+        self.season = fetcher.season
+        self.data_types = data_types
+        self.batch_size = batch_size
+
+    def player_dir(self, data_type):
+        return f"{self.season}_player_{data_type}"
+
+    def stored_game_ids(self, data_type):
+
+        # Only the gameId column is read, the parquet format lets us skip every other column
+        path = self.player_dir(data_type)
+        if not os.path.isdir(path) or not os.listdir(path):
+            return set()
+        return set(pd.read_parquet(path, columns=["gameId"])["gameId"].unique())
+
+    def ingest(self, game_ids=None):
+
+        if game_ids is None:
+            game_ids = self.fetcher.processed_game_logs["gameId"].tolist()
+
+        for data_type in self.data_types:
+            path = self.player_dir(data_type)
+            os.makedirs(path, exist_ok=True)
+
+            stored = self.stored_game_ids(data_type)
+            remaining = [game_id for game_id in game_ids if int(game_id) not in stored]
+            part = len(os.listdir(path))
+            print(f"{self.season} {data_type}: fetching {len(remaining)} games, {len(stored)} already stored")
+
+            for start in range(0, len(remaining), self.batch_size):
+                batch = [
+                    self.fetcher.fetch_box_score(game_id, data_type, "player_stats")
+                    for game_id in remaining[start : start + self.batch_size]
+                ]
+                batch = [df for df in batch if df is not None]
+                if not batch:
+                    continue
+                compact = compact_player_stats(pd.concat(batch, ignore_index=True), data_type)
+                compact.to_parquet(os.path.join(path, f"part-{part:05d}.parquet"), index=False)
+                part += 1
+
+
+# Load the player rows for a season, joining each data type on the player key
+# Only the columns we use are read from disk
+def load_player_stats(season, data_types=("traditional", "advanced")):
+    players = None
+    for data_type in data_types:
+        columns = PLAYER_KEY_COLUMNS + PLAYER_STAT_COLUMNS[data_type]
+        if data_type == "traditional":
+            columns += ["minutes", "comment"]
+        df = pd.read_parquet(f"{season}_player_{data_type}", columns=columns)
+        players = df if players is None else pd.merge(players, df, on=PLAYER_KEY_COLUMNS, how="left")
+    return players
+
+
+# Use this class to turn a season of player rows into team features, one row per team per game
+# For each game, every player's statistics are replaced by their exponentially weighted average over previous
+# games (like Preprocessor.generate_team_running_averages does for teams). The team feature is then the average
+# over the players in the team's rotation who are available for that game, weighted by their usual minutes.
+# This way a team missing its best players looks weaker before the game is played, which team averages can't show.
+class PlayerFeatureAggregator:
+
+    def __init__(self, seasons, span, shift, rotation_size=8, data_types=("traditional", "advanced")):
+
+        # Minutes and availability are only stored with the traditional box score
+        if "traditional" not in data_types:
+            raise ValueError("data_types must include 'traditional'")
+        self.seasons = seasons
+        self.span = span
+        self.shift = shift
+        self.rotation_size = rotation_size
+        self.data_types = data_types
+        self.stat_columns = [col for data_type in data_types for col in PLAYER_STAT_COLUMNS[data_type]]
+
+    def aggregate(self):
+
+        # Seasons are processed one at a time, so only one season of player rows is in memory at once
+        seasons = []
+        for season in self.seasons:
+            print(f"Aggregating player data for {season}")
+            players = load_player_stats(season, self.data_types)
+            games = pd.read_csv(f"{season}_all_games.csv", usecols=["gameId", "GAME_DATE"])
+            players = pd.merge(players, games, on="gameId", how="inner")
+            seasons.append(self.aggregate_season(players))
+        return pd.concat(seasons, ignore_index=True)
+
+    def aggregate_season(self, players):
+
+        players = players.sort_values(["personId", "GAME_DATE", "gameId"]).reset_index(drop=True)
+        players["available"] = ~players["comment"].astype(str).str.upper().str.startswith(UNAVAILABLE_COMMENTS)
+
+        # Statistics from games a player didn't play in would drag their averages towards 0, so they are left out
+        # Minutes are kept, so a player who has stopped getting minutes falls out of the rotation
+        played = players["minutes"] > 0
+        players[self.stat_columns] = players[self.stat_columns].where(played)
+
+        # groupby().ewm() computes every player's running average in one call instead of looping over players
+        # shift makes each row only use games before the one being predicted
+        running = (
+            players.groupby("personId")[["minutes"] + self.stat_columns]
+            .ewm(span=self.span, min_periods=1)
+            .mean()
+            .reset_index(level=0, drop=True)
+            .sort_index()
+        )
+        running = running.groupby(players["personId"]).shift(self.shift)
+
+        # A player's weight is their usual minutes, but only if they are available and in the team's top rotation_size
+        team_game = [players["gameId"], players["teamTricode"]]
+        usual_minutes = running["minutes"].fillna(0)
+        available_minutes = usual_minutes.where(players["available"], 0)
+        rank = available_minutes.groupby(team_game, observed=True).rank(ascending=False, method="first")
+        weight = available_minutes.where(rank <= self.rotation_size, 0)
+
+        weighted = running[self.stat_columns].mul(weight, axis=0)
+        stat_weight = running[self.stat_columns].notna().mul(weight, axis=0)
+
+        keys = players[["gameId", "teamTricode"]].astype({"teamTricode": str})
+        sums = pd.concat(
+            [keys, weighted, stat_weight.add_suffix("_weight"), usual_minutes.rename("usual"), available_minutes.rename("available")],
+            axis=1,
+        ).groupby(["gameId", "teamTricode"], sort=False).sum()
+
+        features = pd.DataFrame(index=sums.index)
+        for col in self.stat_columns:
+            features[f"player_avg_{col}_last_{self.span}"] = sums[col] / sums[f"{col}_weight"].replace(0, np.nan)
+
+        # The share of the team's usual minutes that is available, 1 when everyone is healthy
+        features[f"player_available_minutes_last_{self.span}"] = sums["available"] / sums["usual"].replace(0, np.nan)
+        return features.reset_index()
+
+
+if __name__ == "__main__":
+
+    seasons = ["2024-25"]
+
+    aggregator = PlayerFeatureAggregator(seasons, 10, 1)
+    aggregator.aggregate().to_csv("player_team_features.csv", index=False)
@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from validation import validate_seasons
 from datetime import date
 
 class Preprocessor:
@@ -254,6 +255,10 @@ if __name__ == "__main__":
 
     seasons = ["2024-25"]
 
+    # The inner joins in load_team_data drop games with bad or missing rows, so report them before they disappear
+    print("Validating data")
+    validate_seasons(seasons)
+
     p50 = Preprocessor(seasons, 50, 1)
     p25 = Preprocessor(seasons, 25, 1)
     p10 = Preprocessor(seasons, 10, 1)
@@ -1,5 +1,7 @@
 import pandas as pd
 import numpy as np
+from validation import validate_seasons
+from feature_store import export_feature_matrix
 from datetime import date, datetime
 import unicodedata
 
@@ -15,7 +17,7 @@ def convert_minutes_to_float(time_str):
 
 class Preprocessor:
 
-    def __init__(self, seasons, span, shift, full):
+    def __init__(self, seasons, span, shift, full=False):
         self.seasons = seasons
         self.games = pd.DataFrame()
         print("Loading games")
@@ -272,28 +274,28 @@ class Preprocessor:
         return group
 
 
-if __name__ == "__main__":
-    seasons = [
-        "2024-25",
-        "2023-24"
-    ]
-    p = Preprocessor(seasons, 50, 1, full=True)
-    p25 = Preprocessor(seasons, 25, 1, False)
-    p10 = Preprocessor(seasons, 10, 1, False)
-    p5 = Preprocessor(seasons, 5, 1, False)
-    p3 = Preprocessor(seasons, 3, 1, False)
-
-    common_cols = list(
-        set(p.team_stats.columns).intersection(set(p25.team_stats.columns))
-    )
-
-    p.team_stats = pd.merge(
-        p.team_stats, p25.team_stats, on=common_cols, how="inner"
-    )
-    p.team_stats = pd.merge(
-        p.team_stats, p10.team_stats, on=common_cols, how="inner"
-    )
+# Build one Preprocessor for each span and merge their running averages into a single table
+# The first span's Preprocessor is returned, with the merged averages in its team_stats
+def build_team_averages(seasons, spans, shift):
+
+    # The inner joins in load_team_data drop games with bad or missing rows, so report them once before they disappear
+    print("Validating data")
+    validation_issues = validate_seasons(seasons)
+
+    processors = [Preprocessor(seasons, span, shift) for span in spans]
+    p = processors[0]
+    for other in processors[1:]:
+        common_cols = list(
+            set(p.team_stats.columns).intersection(set(other.team_stats.columns))
+        )
+        p.team_stats = pd.merge(
+            p.team_stats, other.team_stats, on=common_cols, how="inner"
+        )
+    p.validation_issues = validation_issues
+    return p
+
 
+def save_team_averages(p):
     print("Processing complete, saving data")
     try:
         p.games.to_csv("all_games.csv")
@@ -302,3 +304,20 @@ if __name__ == "__main__":
         print(f"Caught {e}, saving to backup files")
         p.games.to_csv("backup_all_games.csv")
         p.team_stats.to_csv("backup_all_team_averages")
+
+    # Training workers attach to this with feature_store.attach_feature_matrix instead of reading the csv
+    # It is saved separately, so a problem with the matrix files doesn't replace the csv files with backups
+    try:
+        export_feature_matrix(p.team_stats, "all_team_averages")
+    except PermissionError as e:
+        print(f"Caught {e}, saving feature matrix to backup files")
+        export_feature_matrix(p.team_stats, "backup_all_team_averages")
+
+
+if __name__ == "__main__":
+    seasons = [
+        "2024-25",
+        "2023-24"
+    ]
+    p = build_team_averages(seasons, [50, 25, 10], 1)
+    save_team_averages(p)
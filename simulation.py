@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+
+# The NBA doesn't publish conferences through nba_api.stats.static.teams, so they're listed here
+CONFERENCES = {
+    "East": ["ATL", "BOS", "BKN", "CHA", "CHI", "CLE", "DET", "IND", "MIA", "MIL", "NYK", "ORL", "PHI", "TOR", "WAS"],
+    "West": ["DAL", "DEN", "GSW", "HOU", "LAC", "LAL", "MEM", "MIN", "NOP", "OKC", "PHX", "POR", "SAC", "SAS", "UTA"],
+}
+TEAMS = sorted(CONFERENCES["East"] + CONFERENCES["West"])
+
+# Seeds 1-6 make the playoffs directly, seeds 7-10 play in the play-in tournament for seeds 7 and 8
+DIRECT_SEEDS = 6
+PLAY_IN_SEEDS = 10
+
+
+# Simulate a batch of seasons at once, as arrays with one row per simulated season
+# This is a module level function so the process pool can send it to worker processes
+# Returns counts of shape (teams, seeds) for regular season seeds, and counts of shape (teams,) for making the playoffs
+def simulate_batch(n_seasons, seed, base_wins, home, away, probabilities, conference_teams, matchup_probabilities):
+
+    rng = np.random.default_rng(seed)
+    n_teams = len(base_wins)
+    n_seeds = max(len(teams) for teams in conference_teams)
+
+    # home_won[i, j] is True if the home team won remaining game j in simulated season i
+    home_won = rng.random((n_seasons, len(probabilities))) < probabilities
+
+    # Adding each game's winner to the wins table is a sum over games, done here as a matrix product
+    home_one_hot = np.zeros((len(home), n_teams), dtype=np.float32)
+    away_one_hot = np.zeros((len(away), n_teams), dtype=np.float32)
+    home_one_hot[np.arange(len(home)), home] = 1
+    away_one_hot[np.arange(len(away)), away] = 1
+    wins = base_wins + home_won.astype(np.float32) @ home_one_hot + (~home_won).astype(np.float32) @ away_one_hot
+
+    # Ties are broken at random, the real tiebreakers need head-to-head records we don't simulate
+    wins = wins + rng.random(wins.shape)
+
+    seed_counts = np.zeros((n_teams, n_seeds), dtype=np.int64)
+    playoff_counts = np.zeros(n_teams, dtype=np.int64)
+    for teams in conference_teams:
+
+        # standings[i, k] is the team index with seed k + 1 in simulated season i
+        order = np.argsort(-wins[:, teams], axis=1)
+        standings = teams[order]
+        np.add.at(seed_counts, (standings, np.arange(len(teams))), 1)
+        np.add.at(playoff_counts, standings[:, :DIRECT_SEEDS], 1)
+
+        # Play-in: 7 hosts 8 for the 7 seed, 9 hosts 10, then the loser of 7/8 hosts the winner of 9/10 for the 8 seed
+        s7, s8, s9, s10 = (standings[:, k] for k in range(DIRECT_SEEDS, PLAY_IN_SEEDS))
+        won_78 = rng.random(n_seasons) < matchup_probabilities[s7, s8]
+        winner_78 = np.where(won_78, s7, s8)
+        loser_78 = np.where(won_78, s8, s7)
+        winner_910 = np.where(rng.random(n_seasons) < matchup_probabilities[s9, s10], s9, s10)
+        winner_last = np.where(
+            rng.random(n_seasons) < matchup_probabilities[loser_78, winner_910], loser_78, winner_910
+        )
+        np.add.at(playoff_counts, winner_78, 1)
+        np.add.at(playoff_counts, winner_last, 1)
+
+    return seed_counts, playoff_counts
+
+
+# Use this class to estimate seed and playoff probabilities for each team from per-game win probabilities
+# games is a DataFrame in the format of all_games.csv, where games that haven't been played have no score
+# The game logs only contain games that have been played, so the unplayed games have to be added from the schedule
+# (see NBADataFetcher.fetch_remaining_schedule and the --schedule option of cli.py fetch)
+# season is of format "YYYY-YY", by default the latest season in games is used
+# probabilities holds the home team's win probability for each unplayed game, either in the same order as the unplayed
+# rows or as a Series indexed by gameId
+# matchup_probabilities is a DataFrame indexed and with columns by team abbreviation, where entry [home, away] is the
+# probability the home team wins. It is used for play-in games, and for unplayed games if probabilities is None
+class SeasonSimulator:
+
+    def __init__(self, games, probabilities=None, matchup_probabilities=None, season=None):
+
+        self.team_index = {team: i for i, team in enumerate(TEAMS)}
+
+        # Digits 3-5 of a gameId are the season type and year, i.e. "0022400061" is a 2024-25 ("24") regular season ("2") game
+        # Only regular season games count towards the standings
+        # Games from other seasons are left out, otherwise their wins would be added to this season's standings
+        season_code = (games["gameId"].astype(int) // 100_000 % 1000).to_numpy()
+        regular_season = season_code // 100 == 2
+        season_year = season_code % 100
+        if season is not None:
+            self.season_year = int(season[2:4])
+        elif regular_season.any():
+            self.season_year = season_year[regular_season].max()
+        else:
+            raise ValueError("No regular season games found")
+        games = games[regular_season & (season_year == self.season_year)]
+        if games.empty:
+            raise ValueError(f"No regular season games found for season {season}")
+
+        # Schedule placeholders (i.e. a blank or TBD team) and non-NBA teams can't be placed in the standings
+        unknown = ~games["HOME_TEAM_ABBREVIATION"].isin(TEAMS) | ~games["AWAY_TEAM_ABBREVIATION"].isin(TEAMS)
+        if unknown.any():
+            raise ValueError(
+                "Unknown team abbreviations in games " + ", ".join(games.loc[unknown, "gameId"].astype(str))
+            )
+
+        # A schedule file goes out of date as soon as the next game is played, so unscored rows for games that are
+        # already in the games file are dropped instead of being simulated on top of their real result
+        games = games.assign(gameId=games["gameId"].astype(int))
+        unscored = games["HOME_TEAM_PTS"].isna() | games["AWAY_TEAM_PTS"].isna()
+        played = games[~unscored].drop_duplicates(subset="gameId")
+        remaining = games[unscored & ~games["gameId"].isin(played["gameId"])].drop_duplicates(subset="gameId")
+
+        # Wins so far for each team
+        winners = np.where(
+            played["HOME_TEAM_PTS"] > played["AWAY_TEAM_PTS"],
+            played["HOME_TEAM_ABBREVIATION"],
+            played["AWAY_TEAM_ABBREVIATION"],
+        )
+        self.base_wins = (
+            pd.Series(winners).value_counts().reindex(TEAMS, fill_value=0).to_numpy(dtype=np.float32)
+        )
+
+        self.home = remaining["HOME_TEAM_ABBREVIATION"].map(self.team_index).to_numpy(dtype=int)
+        self.away = remaining["AWAY_TEAM_ABBREVIATION"].map(self.team_index).to_numpy(dtype=int)
+
+        if matchup_probabilities is None:
+            self.matchup_probabilities = np.full((len(TEAMS), len(TEAMS)), 0.5)
+        else:
+            self.matchup_probabilities = matchup_probabilities.reindex(index=TEAMS, columns=TEAMS).fillna(0.5).to_numpy()
+
+        if isinstance(probabilities, pd.Series):
+            probabilities = probabilities.reindex(remaining["gameId"].astype(int))
+            if probabilities.isna().any():
+                raise ValueError(
+                    f"No probability given for {probabilities.isna().sum()} unplayed games"
+                )
+        if probabilities is not None:
+            self.probabilities = np.asarray(probabilities, dtype=np.float64)
+            if len(self.probabilities) != len(remaining):
+                raise ValueError(
+                    f"Got {len(self.probabilities)} probabilities for {len(remaining)} unplayed games"
+                )
+        elif matchup_probabilities is not None or remaining.empty:
+            self.probabilities = self.matchup_probabilities[self.home, self.away]
+        else:
+            raise ValueError("Either probabilities or matchup_probabilities must be given")
+
+        self.conference_teams = [
+            np.array([self.team_index[team] for team in CONFERENCES[conference]]) for conference in CONFERENCES
+        ]
+
+    def simulate(self, n_seasons=100_000, batch_size=5_000, processes=None, seed=None):
+
+        # Each batch gets its own independent random stream, so results only depend on seed, not on how batches are scheduled
+        batch_sizes = [min(batch_size, n_seasons - start) for start in range(0, n_seasons, batch_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+        args = [
+            (size, batch_seed, self.base_wins, self.home, self.away, self.probabilities, self.conference_teams, self.matchup_probabilities)
+            for size, batch_seed in zip(batch_sizes, seeds)
+        ]
+
+        if processes == 1:
+            results = [simulate_batch(*batch_args) for batch_args in args]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                results = list(executor.map(simulate_batch, *zip(*args)))
+
+        seed_counts = sum(result[0] for result in results)
+        playoff_counts = sum(result[1] for result in results)
+
+        # One row per team, with the probability of each regular season seed and of making the playoffs
+        probabilities = pd.DataFrame(
+            seed_counts / n_seasons,
+            index=TEAMS,
+            columns=[f"seed_{k + 1}" for k in range(seed_counts.shape[1])],
+        )
+        probabilities["play_in"] = probabilities[[f"seed_{k}" for k in range(DIRECT_SEEDS + 1, PLAY_IN_SEEDS + 1)]].sum(axis=1)
+        probabilities["playoffs"] = playoff_counts / n_seasons
+        probabilities["expected_wins"] = self.base_wins + np.bincount(
+            np.concatenate([self.home, self.away]),
+            weights=np.concatenate([self.probabilities, 1 - self.probabilities]),
+            minlength=len(TEAMS),
+        )
+        probabilities.insert(0, "conference", [
+            "East" if team in CONFERENCES["East"] else "West" for team in TEAMS
+        ])
+        return probabilities.sort_values(["conference", "expected_wins"], ascending=[True, False])
@@ -0,0 +1,218 @@
+import pandas as pd
+import numpy as np
+
+
+# The five box score sources we save for each season, keyed by the data_type used in NBADataFetcher.fetch_box_score
+# Each source is saved to a file named f"{season}_{data_type}_stats.csv"
+BOX_SCORE_SOURCES = ["advanced", "traditional", "hustle", "misc", "track"]
+
+# Every box score source has one row per team per game, identified by these two columns
+KEY_COLUMNS = ["gameId", "teamTricode"]
+
+# Allowed (low, high) values for numeric columns in each source
+# Anything outside of these bounds is almost certainly a bad API response rather than a real box score
+RANGE_CHECKS = {
+    "advanced": {
+        "offensiveRating": (0, 250),
+        "defensiveRating": (0, 250),
+        "netRating": (-150, 150),
+        "assistPercentage": (0, 1),
+        "offensiveReboundPercentage": (0, 1),
+        "defensiveReboundPercentage": (0, 1),
+        "reboundPercentage": (0, 1),
+        "effectiveFieldGoalPercentage": (0, 1.5),
+        "trueShootingPercentage": (0, 1.5),
+        "pace": (50, 150),
+        "possessions": (50, 200),
+        "PIE": (0, 1),
+    },
+    "traditional": {
+        "fieldGoalsMade": (0, 100),
+        "fieldGoalsAttempted": (1, 200),
+        "fieldGoalsPercentage": (0, 1),
+        "threePointersPercentage": (0, 1),
+        "freeThrowsPercentage": (0, 1),
+        "reboundsTotal": (0, 120),
+        "assists": (0, 80),
+        "turnovers": (0, 60),
+        "points": (40, 200),
+        "plusMinusPoints": (-100, 100),
+    },
+    "hustle": {
+        "contestedShots": (0, 200),
+        "deflections": (0, 100),
+        "screenAssists": (0, 100),
+        "boxOuts": (0, 100),
+    },
+    "misc": {
+        "pointsOffTurnovers": (0, 100),
+        "pointsSecondChance": (0, 100),
+        "pointsFastBreak": (0, 100),
+        "pointsPaint": (0, 150),
+        "foulsDrawn": (0, 80),
+    },
+    "track": {
+        "distance": (5, 40),
+        "touches": (100, 800),
+        "passes": (100, 600),
+        "contestedFieldGoalPercentage": (0, 1),
+        "uncontestedFieldGoalsPercentage": (0, 1),
+        "defendedAtRimFieldGoalPercentage": (0, 1),
+    },
+}
+
+
+# Use this class to check the saved data for a season before it is preprocessed
+# The preprocessors merge the five box score sources with inner joins, so any game with a bad or missing row
+# disappears silently. This class finds those games and reports them so they can be re-fetched.
+class DataValidator:
+
+    def __init__(self, season):
+
+        # Season must be of format "YYYY-YY" (i.e., "2023-24")
+        self.season = season
+
+        # gameId is saved with leading zeros in the games file but read back as an integer, same as the box score files
+        self.games = pd.read_csv(f"{season}_all_games.csv")
+        self.sources = {
+            data_type: pd.read_csv(f"{season}_{data_type}_stats.csv")
+            for data_type in BOX_SCORE_SOURCES
+        }
+
+        # Each check appends a DataFrame with columns gameId, source, check, detail
+        self.issues = []
+
+    def check_team_rows(self):
+
+        # Every game should have exactly two rows in each source, one for each team
+        for data_type, df in self.sources.items():
+            counts = df.groupby("gameId").size()
+            bad_counts = counts[counts != 2]
+            self.add_issues(
+                bad_counts.index,
+                data_type,
+                "team_rows",
+                bad_counts.astype(str).radd("rows=").to_numpy(),
+            )
+
+    def check_missing_games(self):
+
+        # A game is missing from a source if it is in the games file but not the source, or the other way around
+        game_ids = pd.Index(self.games["gameId"].unique())
+        for data_type, df in self.sources.items():
+            source_ids = pd.Index(df["gameId"].unique())
+            self.add_issues(
+                game_ids.difference(source_ids), data_type, "missing_game", "not in source"
+            )
+            self.add_issues(
+                source_ids.difference(game_ids), data_type, "missing_game", "not in games"
+            )
+
+    def check_numeric_ranges(self):
+
+        for data_type, bounds in RANGE_CHECKS.items():
+            df = self.sources[data_type]
+            for col, (low, high) in bounds.items():
+                if col not in df.columns:
+                    continue
+
+                # NaN counts as out of range, since the preprocessors will average it into the running stats
+                values = pd.to_numeric(df[col], errors="coerce")
+                bad_rows = df[~values.between(low, high)]
+                self.add_issues(
+                    bad_rows["gameId"],
+                    data_type,
+                    "range",
+                    bad_rows["teamTricode"] + f" {col}=" + values[bad_rows.index].astype(str),
+                )
+
+        # The games file is checked for scores as well, since the winner is computed from them
+        for col in ["HOME_TEAM_PTS", "AWAY_TEAM_PTS"]:
+            bad_rows = self.games[~self.games[col].between(40, 200)]
+            self.add_issues(
+                bad_rows["gameId"], "games", "range", f"{col}=" + bad_rows[col].astype(str)
+            )
+
+    def check_duplicate_keys(self):
+
+        # keep=False marks every copy of a duplicated key, not just the second one
+        for data_type, df in self.sources.items():
+            duplicated = df[df.duplicated(subset=KEY_COLUMNS, keep=False)]
+            self.add_issues(
+                duplicated["gameId"].unique(), data_type, "duplicate_key", "gameId, teamTricode"
+            )
+        duplicated = self.games[self.games.duplicated(subset=["gameId"], keep=False)]
+        self.add_issues(duplicated["gameId"].unique(), "games", "duplicate_key", "gameId")
+
+    def add_issues(self, game_ids, source, check, detail):
+        if len(game_ids) == 0:
+            return
+        self.issues.append(
+            pd.DataFrame(
+                {
+                    "gameId": np.asarray(game_ids),
+                    "source": source,
+                    "check": check,
+                    "detail": np.asarray(detail) if np.ndim(detail) else detail,
+                }
+            )
+        )
+
+    def validate(self):
+
+        self.issues = []
+        self.check_team_rows()
+        self.check_missing_games()
+        self.check_numeric_ranges()
+        self.check_duplicate_keys()
+
+        if self.issues:
+            return pd.concat(self.issues, ignore_index=True)
+        return pd.DataFrame(columns=["gameId", "source", "check", "detail"])
+
+    def summary(self, issues):
+
+        # Compact report: one row per source and check, with the number of games affected
+        if issues.empty:
+            return f"{self.season}: no data quality issues found"
+        counts = issues.groupby(["source", "check"])["gameId"].nunique()
+        lines = [f"{self.season}: {issues['gameId'].nunique()} games with data quality issues"]
+        lines += [f"  {source:<12} {check:<14} {count}" for (source, check), count in counts.items()]
+        return "\n".join(lines)
+
+    def refetch_sources(self, issues):
+
+        # Issues in the games file come from the game logs, re-fetching a box score can't fix them
+        issues = issues[issues["source"] != "games"]
+
+        # gameIds are read back as integers, but the API expects the 10 character string (i.e., "0022400061")
+        game_ids = issues["gameId"].astype(int).astype(str).str.zfill(10)
+        return {
+            data_type: sorted(ids.unique())
+            for data_type, ids in game_ids.groupby(issues["source"])
+        }
+
+    def refetch_game_ids(self, issues):
+
+        # Every game that needs at least one box score re-fetched
+        return sorted(set().union(*self.refetch_sources(issues).values()))
+
+
+# Validate each season, printing the summary and the gameIds to re-fetch
+# Returns the issues for every season in one DataFrame
+def validate_seasons(seasons):
+    issues = []
+    for season in seasons:
+        validator = DataValidator(season)
+        season_issues = validator.validate()
+        print(validator.summary(season_issues))
+        if not season_issues.empty:
+            print("Re-fetch: " + " ".join(validator.refetch_game_ids(season_issues)))
+        issues.append(season_issues)
+    return pd.concat(issues, ignore_index=True)
+
+
+if __name__ == "__main__":
+
+    seasons = ["2024-25", "2023-24"]
+    validate_seasons(seasons)